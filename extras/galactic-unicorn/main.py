@@ -9,11 +9,14 @@ Colors:
   BLUE   = unknown/no data
 """
 
+import gc
 import network
-import urequests
+import json
+import uasyncio
 import time
 import random
 import math
+from array import array
 from galactic import GalacticUnicorn
 from picographics import PicoGraphics, DISPLAY_GALACTIC_UNICORN
 
@@ -30,8 +33,29 @@ try:
 except ImportError:
     pass
 
+# Polling adapts between these bounds: fast while something is degraded,
+# backing off when every status has been stable for STABLE_POLLS polls
 REFRESH_INTERVAL_MS = 30000
+MIN_REFRESH_MS = 5000
+MAX_REFRESH_MS = 120000
+STABLE_POLLS = 3
+# A response stays fresh for the fastest poll interval. fetch_task starts
+# each wait after the previous fetch returns, so a scheduled poll always
+# finds it older than this and goes out; only an extra unforced fetch
+# inside the window is served from the cache.
+STATUS_TTL_MS = MIN_REFRESH_MS
+FETCH_TIMEOUT_MS = 5000  # Per request; enough for a Pico W TLS handshake
+FETCH_RETRIES = 2       # Extra attempts after a failed request...
+RETRY_DELAY_MS = 250
+FETCH_BUDGET_MS = 12000  # ...as long as another full attempt fits in this
+MAX_BACKOFF_S = 300     # Ceiling for retrying a failing source
+KEEPALIVE_IDLE_MS = 60000  # Reconnect rather than trust a socket NAT may have dropped
 BRIGHTNESS = 0.5
+FRAME_MS = 50  # ~20 FPS
+BUTTON_REPEAT_MS = 200  # Brightness step rate while a button is held
+
+# Collect between frames once free heap drops below this, never mid-render
+GC_HEADROOM = 16 * 1024
 
 # =============================================================================
 # DISPLAY SETUP
@@ -58,74 +82,122 @@ PEN_BLUE = graphics.create_pen(0, 60, 150)
 PEN_BLUE_DIM = graphics.create_pen(0, 25, 60)
 PEN_BLUE_BRIGHT = graphics.create_pen(0, 100, 200)
 
+# Integer status codes; bit 2 marks data as stale
+STATUS_UNKNOWN = 0
+STATUS_OPERATIONAL = 1
+STATUS_DEGRADED = 2
+STATUS_OUTAGE = 3
+STALE_BIT = 4
+
+STATUS_CODES = {
+    'operational': STATUS_OPERATIONAL,
+    'degraded': STATUS_DEGRADED,
+    'outage': STATUS_OUTAGE,
+}
+
+# (dim, mid, bright) pens indexed by status code | stale bit. Stale entries
+# shift each tier down one step so old data reads as dimmed.
+PEN_LUT = (
+    (PEN_BLUE_DIM, PEN_BLUE, PEN_BLUE_BRIGHT),
+    (PEN_GREEN_DIM, PEN_GREEN, PEN_GREEN_BRIGHT),
+    (PEN_YELLOW_DIM, PEN_YELLOW, PEN_YELLOW_BRIGHT),
+    (PEN_RED_DIM, PEN_RED, PEN_RED_BRIGHT),
+    (PEN_BLUE_DIM, PEN_BLUE_DIM, PEN_BLUE),
+    (PEN_GREEN_DIM, PEN_GREEN_DIM, PEN_GREEN),
+    (PEN_YELLOW_DIM, PEN_YELLOW_DIM, PEN_YELLOW),
+    (PEN_RED_DIM, PEN_RED_DIM, PEN_RED),
+)
+
 # =============================================================================
 # METRICS STATE
 # =============================================================================
 
-metrics = {}  # name -> 'operational' | 'degraded' | 'outage' | None
+# Bubbles whose data is older than this are drawn dimmed; fetch_task keeps
+# it at twice the current poll interval
+stale_ms = 2 * REFRESH_INTERVAL_MS
 
 
 def log(msg):
     print(f"[{time.ticks_ms()}] {msg}")
 
 
+def classify(status):
+    """Map a Lens status string to a STATUS_* code"""
+    return STATUS_CODES.get(status, STATUS_UNKNOWN)
+
+
 # =============================================================================
 # BUBBLE CLASS
 # =============================================================================
 
+# Horizontal wobble per step of a 256-entry phase, so Bubble.update indexes
+# a table instead of calling math.sin per bubble per frame
+WOBBLE_STEPS = 256
+WOBBLE_LUT = array('f', [0.15 * math.sin(2 * math.pi * i / WOBBLE_STEPS)
+                         for i in range(WOBBLE_STEPS)])
+STEPS_PER_RADIAN = WOBBLE_STEPS / (2 * math.pi)
+
+
 class Bubble:
     def __init__(self, metric_name, x=None):
         self.metric_name = metric_name
+        self.metric_id = NAME_TO_ID[metric_name]
         self.label = metric_name.replace('_', ' ').upper()[:8]  # Short label
         self.x = float(x if x is not None else random.randint(0, WIDTH - 1))
         self.y = float(random.randint(0, HEIGHT - 1))
         self.r = random.uniform(2.0, 4.0)  # radius
+        self.radius = int(self.r)  # glow footprint, see GLOW_STARTS
         self.speed = random.uniform(0.03, 0.1)  # upward speed
-        self.wobble = random.uniform(0, 6.28)  # phase offset
-        self.wobble_speed = random.uniform(0.03, 0.1)
+        self.wobble = random.uniform(0, WOBBLE_STEPS)  # phase, in LUT steps
+        self.wobble_speed = random.uniform(0.03, 0.1) * STEPS_PER_RADIAN
         self.text_offset = 0.0  # for scrolling text
 
+    @micropython.native
     def update(self):
-        # Float upward
-        self.y -= self.speed
+        # Work on locals and write back once: attribute access is the
+        # expensive part of this per-frame update
+        x = self.x
+        y = self.y - self.speed  # Float upward
 
         # Gentle horizontal wobble
-        self.wobble += self.wobble_speed
-        self.x += math.sin(self.wobble) * 0.15
+        wobble = self.wobble + self.wobble_speed
+        if wobble >= WOBBLE_STEPS:
+            wobble -= WOBBLE_STEPS
+        self.wobble = wobble
+        x += WOBBLE_LUT[int(wobble)]
 
         # Scroll text
         self.text_offset += 0.1
 
         # Wrap around
-        if self.y < -self.r:
-            self.y = HEIGHT + self.r
-            self.x = float(random.randint(3, WIDTH - 4))
+        r = self.r
+        if y < -r:
+            y = HEIGHT + r
+            x = float(random.randint(3, WIDTH - 4))
 
         # Keep in bounds horizontally
-        if self.x < 1:
-            self.x = 1
-        if self.x >= WIDTH - 1:
-            self.x = WIDTH - 2
-
-    def get_pens(self):
-        """Get (dim, mid, bright) pens based on status"""
-        status = metrics.get(self.metric_name)
-
-        if status == 'operational':
-            return (PEN_GREEN_DIM, PEN_GREEN, PEN_GREEN_BRIGHT)
-        elif status == 'degraded':
-            return (PEN_YELLOW_DIM, PEN_YELLOW, PEN_YELLOW_BRIGHT)
-        elif status == 'outage':
-            return (PEN_RED_DIM, PEN_RED, PEN_RED_BRIGHT)
-        else:
-            return (PEN_BLUE_DIM, PEN_BLUE, PEN_BLUE_BRIGHT)
+        if x < 1:
+            x = 1.0
+        if x >= WIDTH - 1:
+            x = WIDTH - 2.0
+        self.x = x
+        self.y = y
+
+    @micropython.native
+    def get_pen_row(self):
+        """Get the PEN_LUT row for this bubble's status, dimmed when stale"""
+        metric_id = self.metric_id
+        status = STATUS[metric_id]
+        if status and time.ticks_diff(time.ticks_ms(), FETCHED_AT[metric_id]) > stale_ms:
+            return status | STALE_BIT
+        return status
 
 
 # =============================================================================
 # METRIC DEFINITIONS
 # =============================================================================
 
-METRIC_NAMES = [
+METRIC_NAMES = (
     # Core services
     'billing_us', 'billing_eu', 'proxy_us', 'proxy_eu',
     # Infrastructure
@@ -140,7 +212,13 @@ METRIC_NAMES = [
     'internal_grafana', 'internal_brave',
     # Overall
     'overall',
-]
+)
+
+# Fixed per-metric slots, written in place on every refresh
+NAME_TO_ID = {name: i for i, name in enumerate(METRIC_NAMES)}
+STATUS = bytearray(len(METRIC_NAMES))             # STATUS_* code
+FETCHED_AT = array('i', [0] * len(METRIC_NAMES))  # ticks_ms of the data
+SOURCE_OF = bytearray(len(METRIC_NAMES))          # source_id() of the writer
 
 bubbles = []
 
@@ -159,18 +237,30 @@ def setup_bubbles():
 # NETWORKING
 # =============================================================================
 
+# wlan.status() codes that mean connecting has already failed
+WIFI_FATAL = (network.STAT_WRONG_PASSWORD, network.STAT_NO_AP_FOUND,
+              network.STAT_CONNECT_FAIL)
+
+
 def connect_wifi():
     wlan = network.WLAN(network.STA_IF)
     wlan.active(True)
 
     if not wlan.isconnected():
         log(f"Connecting to {WIFI_SSID}...")
+        start = time.ticks_ms()
         wlan.connect(WIFI_SSID, WIFI_PASSWORD)
 
-        for i in range(30):
+        # Poll finely so a quick join isn't rounded up to a whole second, and
+        # give up early on failures that waiting won't fix
+        for i in range(300):
             if wlan.isconnected():
                 break
-            time.sleep(1)
+            if wlan.status() in WIFI_FATAL:
+                log(f"WiFi status {wlan.status()}")
+                break
+            time.sleep_ms(100)
+        log(f"WiFi wait took {time.ticks_diff(time.ticks_ms(), start)} ms")
 
     if wlan.isconnected():
         log(f"Connected! IP: {wlan.ifconfig()[0]}")
@@ -180,116 +270,619 @@ def connect_wifi():
         return False
 
 
-def fetch_metrics():
-    """Fetch status from CIRISLens public API"""
-    log("Fetching metrics...")
-
-    try:
-        response = urequests.get(
-            f"{LENS_API_URL}/lens-api/api/v1/status",
-            timeout=15
+# (url, ttl_ms) - every URL here is fetched concurrently on each refresh.
+# Lens already fans out to billing/proxy/infra checks server-side over fast
+# intra-cluster links and returns them as one payload, so new sources should
+# be added to that aggregate rather than as extra handshakes from the Pico.
+# Slow-moving sources can use a longer TTL than the poll interval.
+STATUS_URLS = (
+    (f"{LENS_API_URL}/lens-api/api/v1/status", STATUS_TTL_MS),
+)
+
+# url -> ttl_ms: a URL listed more than once is fetched once per poll, at the
+# shortest TTL it was given. Distinct URLs on one host share a HostClient.
+SOURCES = {}
+for _url, _ttl_ms in STATUS_URLS:
+    SOURCES[_url] = min(_ttl_ms, SOURCES.get(_url, _ttl_ms))
+del _url, _ttl_ms
+
+
+def split_url(url):
+    """Split 'https://host[:port]/path' into (host, port, path)"""
+    scheme, _, rest = url.partition('://')
+    hostport, slash, path = rest.partition('/')
+    host, _, port = hostport.partition(':')
+    if port:
+        port = int(port)
+    else:
+        port = 443 if scheme == 'https' else 80
+    return host, port, slash + path
+
+
+class HostClient:
+    """Keep-alive HTTP/1.1 connection to one host, reused across polls"""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+        self.last_used = 0
+        # One request at a time: concurrent fetches to the same host would
+        # otherwise interleave on the shared socket
+        self.lock = uasyncio.Lock()
+
+    async def connect(self):
+        self.reader, self.writer = await uasyncio.open_connection(
+            self.host, self.port, ssl=(self.port == 443)
         )
 
-        if response.status_code == 200:
-            data = response.json()
-            response.close()
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = None
+        self.writer = None
+
+    async def get(self, request, timeout_ms):
+        """Send a prebuilt request; return (status_code, body, etag)
+
+        Requests queue for the connection; timeout_ms starts once this one
+        holds it.
+        """
+        async with self.lock:
+            try:
+                return await uasyncio.wait_for_ms(self._exchange(request), timeout_ms)
+            except uasyncio.TimeoutError:
+                # A half-read response leaves the stream unusable
+                self.close()
+                raise
+
+    async def _exchange(self, request):
+        """Send and read one request, reconnecting if keep-alive was dropped"""
+        if self.writer is not None and time.ticks_diff(
+                time.ticks_ms(), self.last_used) > KEEPALIVE_IDLE_MS:
+            # A NAT that silently dropped the mapping would leave the read
+            # hanging until FETCH_TIMEOUT_MS, so don't reuse long-idle sockets
+            self.close()
+        reused = self.writer is not None
+        if not reused:
+            await self.connect()
+        try:
+            response = await self._request(request)
+        except (OSError, EOFError, ValueError, IndexError):
+            self.close()
+            if not reused:
+                raise
+            # The pooled socket went stale between polls - retry on a fresh one
+            await self.connect()
+            try:
+                response = await self._request(request)
+            except (OSError, EOFError, ValueError, IndexError):
+                self.close()
+                raise
+        self.last_used = time.ticks_ms()
+        return response
+
+    async def _request(self, request):
+        self.writer.write(request)
+        await self.writer.drain()
+
+        line = await self.reader.readline()
+        if not line:
+            raise EOFError("connection closed")
+        status_code = int(line.split(b" ", 2)[1])
+
+        length = None
+        chunked = False
+        keep_alive = True
+        etag = None
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.partition(b":")
+            name = name.strip().lower()
+            value = value.strip()
+            if name == b"etag":
+                etag = value  # opaque, so compared case-sensitively
+                continue
+            value = value.lower()
+            if name == b"content-length":
+                length = int(value)
+            elif name == b"transfer-encoding":
+                chunked = b"chunked" in value
+            elif name == b"connection":
+                keep_alive = value != b"close"
+
+        if status_code == 304:
+            body = b""  # never has a body, whatever the headers say
+        elif chunked:
+            body = await self._read_chunked()
+        elif length is not None:
+            body = await self.reader.readexactly(length)
+        else:
+            body = await self.reader.read(-1)
+            keep_alive = False
+
+        if not keep_alive:
+            self.close()
+        return status_code, body, etag
+
+    async def _read_chunked(self):
+        parts = []
+        while True:
+            size = int((await self.reader.readline()).split(b";")[0], 16)
+            if size == 0:
+                await self.reader.readline()
+                return b"".join(parts)
+            parts.append(await self.reader.readexactly(size))
+            await self.reader.readline()
+
+
+SESSIONS = {}  # (host, port) -> HostClient
+
+
+def close_sessions():
+    """Drop all pooled connections (e.g. after WiFi loss)"""
+    for client in SESSIONS.values():
+        client.close()
+
+
+def build_request(host, path, headers=None):
+    """Encode a keep-alive GET request, minus the blank line ending the headers"""
+    request = f"GET {path} HTTP/1.1\r\nHost: {host}\r\n"
+    request += "Connection: keep-alive\r\n"
+    if headers:
+        for name, value in headers.items():
+            request += f"{name}: {value}\r\n"
+    return request.encode()
+
+
+# url -> (HostClient, request bytes); built on first use so polls reuse the
+# same bytes instead of re-formatting and re-encoding them every time
+_targets = {}
+
+# url -> ETag of the last payload applied, sent back as If-None-Match
+_etags = {}
+
+# fetch_json's result for a 304: the last applied payload is still current
+NOT_MODIFIED = object()
+
+
+async def fetch_json(url, headers=None):
+    """GET a URL over a pooled connection and return (data, etag)
+
+    data is the decoded JSON object and etag the response's ETag or None.
+    Returns NOT_MODIFIED when the server answers 304 to the ETag of the
+    last applied payload, so an unchanged status skips the download and
+    parse. Headers are fixed per URL: they are encoded into the cached
+    request the first time the URL is fetched.
+    """
+    target = _targets.get(url)
+    if target is None:
+        host, port, path = split_url(url)
+        client = SESSIONS.get((host, port))
+        if client is None:
+            client = SESSIONS[(host, port)] = HostClient(host, port)
+        target = _targets[url] = (client, build_request(host, path, headers))
+    client, request = target
+    etag = _etags.get(url)
+    if etag is None:
+        request += b"\r\n"
+    else:
+        request += b"If-None-Match: " + etag + b"\r\n\r\n"
+
+    status_code, body, etag = await client.get(request, FETCH_TIMEOUT_MS)
+    if status_code == 304:
+        return NOT_MODIFIED
+    if status_code != 200:
+        raise OSError(f"HTTP {status_code}")
+    data = json.loads(body)
+    if not isinstance(data, dict):
+        raise ValueError("payload is not a JSON object")
+    return data, etag
+
+
+async def fetch_json_retry(url):
+    """fetch_json with up to FETCH_RETRIES retries inside FETCH_BUDGET_MS
+
+    A single dropped packet shouldn't cost a whole poll interval, but a
+    source that keeps failing is left to the backoff in record_result.
+    """
+    deadline = time.ticks_add(time.ticks_ms(), FETCH_BUDGET_MS)
+    retries = FETCH_RETRIES
+    while True:
+        try:
+            return await fetch_json(url)
+        except (OSError, EOFError, ValueError, IndexError, uasyncio.TimeoutError):
+            # EOFError/IndexError: a truncated or malformed response line
+            remaining = time.ticks_diff(deadline, time.ticks_ms())
+            if retries <= 0 or remaining < RETRY_DELAY_MS + FETCH_TIMEOUT_MS:
+                raise
+            retries -= 1
+        await uasyncio.sleep_ms(RETRY_DELAY_MS)
+
+
+# url -> fetched_at_ms of the last payload applied or confirmed by a 304.
+# Only the timestamp is kept: the decoded dict tree is the largest
+# allocation of a refresh and nothing reads it again once applied.
+_cache = {}
+
+
+async def cached_get(url, ttl_ms, force=False):
+    """Return (fetched_at_ms, data, etag) for a URL
+
+    data is None when there is nothing new to apply: the last payload is
+    younger than ttl_ms, or the server confirmed it with a 304.
+    """
+    applied_at = _cache.get(url)
+    if not force and applied_at is not None:
+        if time.ticks_diff(time.ticks_ms(), applied_at) < ttl_ms:
+            return applied_at, None, None
+    fetched_at = time.ticks_ms()
+    result = await fetch_json_retry(url)
+    if result is NOT_MODIFIED:
+        if applied_at is None:
+            # Nothing left to confirm; drop the ETag so the next poll
+            # downloads the payload again
+            _etags.pop(url, None)
+            raise OSError("304 with no applied payload")
+        # What we have is still current, just confirmed later
+        restamp_status(source_id(url), applied_at, fetched_at)
+        _cache[url] = fetched_at
+        return fetched_at, None, None
+    data, etag = result
+    return fetched_at, data, etag
+
+
+# (payload section, metric prefix, simplify) for the flat provider maps in
+# the Lens /status payload. simplify keeps the part of the name before the
+# first dot, e.g. 'lens.postgresql' -> 'db_lens'.
+PROVIDER_GROUPS = (
+    ('infrastructure', 'infra_', False),
+    ('llm_providers', 'llm_', False),
+    ('database_providers', 'db_', True),
+    ('auth_providers', 'auth_', False),
+    ('internal_providers', 'internal_', True),
+)
+
+
+def check_metric_names():
+    """Fail fast on METRIC_NAMES entries the /status payload can never fill
+
+    A misspelt name would otherwise leave its bubble blue forever. Names
+    are checked against what Lens publishes: regional services as
+    <service>_<region>, provider groups under their PROVIDER_GROUPS prefix.
+    Add a name here when Lens starts reporting it.
+    """
+    known = {'overall'}
+    for service in ('billing', 'proxy', 'db'):
+        for region in ('us', 'eu'):
+            known.add(f"{service}_{region}")
+    known.update((
+        'infra_vultr', 'infra_hetzner', 'infra_github',
+        'llm_openrouter', 'llm_groq', 'llm_together',
+        'db_lens',
+        'auth_google_oauth', 'auth_google_play',
+        'internal_grafana', 'internal_brave',
+    ))
+    assert len(NAME_TO_ID) == len(METRIC_NAMES), "duplicate name in METRIC_NAMES"
+    for name in METRIC_NAMES:
+        if name not in known:
+            raise AssertionError(f"METRIC_NAMES entry has no source: {name}")
+
+if __debug__:
+    check_metric_names()
+    assert STATUS_TTL_MS >= MIN_REFRESH_MS, "STATUS_TTL_MS would never produce a cache hit"
+
+
+_source_ids = {}  # url -> small int id, stored per slot in SOURCE_OF
+
+
+def source_id(url):
+    """Return the id recorded in SOURCE_OF for slots written from url"""
+    sid = _source_ids.get(url)
+    if sid is None:
+        sid = _source_ids[url] = len(_source_ids) + 1
+    return sid
+
+
+def set_status(name, status, fetched_at, source):
+    """Store a status in the metric's slot; names not on the display are dropped"""
+    i = NAME_TO_ID.get(name, -1)
+    if i >= 0:
+        STATUS[i] = classify(status)
+        FETCHED_AT[i] = fetched_at
+        SOURCE_OF[i] = source
+
+
+def restamp_status(source, old, new):
+    """Move one source's slots last written with fetched_at old to new, so
+    confirmed data doesn't go stale
+
+    Sources gathered together share a fetched_at tick, so the source id
+    keeps a 304 from one of them from refreshing another's slots.
+    """
+    for i in range(len(FETCHED_AT)):
+        if SOURCE_OF[i] == source and FETCHED_AT[i] == old:
+            FETCHED_AT[i] = new
+
+
+def apply_status(data, fetched_at, source):
+    """Decode a CIRISLens /status payload straight into the metric slots"""
+    # Overall
+    set_status('overall', data.get('status'), fetched_at, source)
+    log(f"  Overall: {data.get('status', 'unknown')}")
 
-            # Overall
-            metrics['overall'] = data.get('status', 'unknown')
-            log(f"  Overall: {metrics['overall']}")
+    # Regional services
+    regions = data.get('regions', {})
+    for region_key, region_data in regions.items():
+        region = 'us' if 'us' in region_key.lower() else 'eu'
+        services = region_data.get('services', {})
 
-            # Regional services
-            regions = data.get('regions', {})
-            for region_key, region_data in regions.items():
-                region = 'us' if 'us' in region_key.lower() else 'eu'
-                services = region_data.get('services', {})
+        for svc_name, svc_data in services.items():
+            key = f"{svc_name}_{region}"
+            set_status(key, svc_data.get('status'), fetched_at, source)
 
-                for svc_name, svc_data in services.items():
-                    key = f"{svc_name}_{region}"
-                    metrics[key] = svc_data.get('status', 'unknown')
+    # Provider groups
+    for section, prefix, simplify in PROVIDER_GROUPS:
+        for name, info in data.get(section, {}).items():
+            if simplify:
+                name = name.split('.')[0]
+            set_status(prefix + name, info.get('status'), fetched_at, source)
 
-            # Infrastructure
-            for name, info in data.get('infrastructure', {}).items():
-                metrics[f'infra_{name}'] = info.get('status', 'unknown')
 
-            # LLM Providers
-            for name, info in data.get('llm_providers', {}).items():
-                metrics[f'llm_{name}'] = info.get('status', 'unknown')
+_backoff = {}  # url -> (consecutive_failures, next_try_ms)
 
-            # Database
-            for name, info in data.get('database_providers', {}).items():
-                # Simplify names like 'lens.postgresql' -> 'db_lens'
-                simple = name.split('.')[0]
-                metrics[f'db_{simple}'] = info.get('status', 'unknown')
 
-            # Auth
-            for name, info in data.get('auth_providers', {}).items():
-                metrics[f'auth_{name}'] = info.get('status', 'unknown')
+def in_backoff(url):
+    """True while a failing source is waiting out its retry delay"""
+    entry = _backoff.get(url)
+    return entry is not None and time.ticks_diff(entry[1], time.ticks_ms()) > 0
 
-            # Internal
-            for name, info in data.get('internal_providers', {}).items():
-                simple = name.split('.')[0]
-                metrics[f'internal_{simple}'] = info.get('status', 'unknown')
 
-            log(f"  Loaded {len(metrics)} metrics")
-            return True
-        else:
-            log(f"  ERROR: {response.status_code}")
-            response.close()
-            return False
+def record_result(url, ok):
+    """Reset a source's backoff on success, double its retry delay on failure"""
+    if ok:
+        _backoff.pop(url, None)
+        return
+    failures = _backoff.get(url, (0, 0))[0] + 1
+    delay_ms = min(1 << failures, MAX_BACKOFF_S) * 1000
+    _backoff[url] = (failures, time.ticks_add(time.ticks_ms(), delay_ms))
 
-    except Exception as e:
-        log(f"  ERROR: {type(e).__name__}: {e}")
-        return False
+
+async def fetch_metrics(force=False):
+    """Fetch status from CIRISLens public API; force bypasses cache and backoff"""
+    log("Fetching metrics...")
+
+    if not network.WLAN(network.STA_IF).isconnected():
+        close_sessions()
+
+    # Sources in backoff are skipped so a dead one can't hold up the rest;
+    # their bubbles dim as their data ages
+    due = [(url, ttl_ms) for url, ttl_ms in SOURCES.items()
+           if force or not in_backoff(url)]
+    ok = len(due) == len(SOURCES)
+    if not ok:
+        log(f"  Skipping {len(SOURCES) - len(due)} source(s) in backoff")
+
+    # All sources in flight at once: refresh time is max(RTT), not sum(RTT)
+    results = await uasyncio.gather(
+        *[cached_get(url, ttl_ms, force) for url, ttl_ms in due],
+        return_exceptions=True
+    )
+
+    for (url, _), result in zip(due, results):
+        if isinstance(result, Exception):
+            log(f"  ERROR: {url}: {type(result).__name__}: {result}")
+            record_result(url, False)
+            ok = False
+        elif result[1] is None:
+            # A TTL hit or 304 on an applied payload has nothing new to decode
+            record_result(url, True)
+        else:
+            fetched_at, data, etag = result
+            try:
+                apply_status(data, fetched_at, source_id(url))
+            except (AttributeError, TypeError, ValueError) as e:
+                # A JSON object of the wrong shape: forget the source's
+                # last payload so the next poll refetches instead of a TTL
+                # hit or 304
+                log(f"  ERROR: {url}: bad payload: {type(e).__name__}: {e}")
+                _etags.pop(url, None)
+                _cache.pop(url, None)
+                record_result(url, False)
+                ok = False
+            else:
+                record_result(url, True)
+                _cache[url] = fetched_at
+                if etag is None:
+                    _etags.pop(url, None)
+                else:
+                    _etags[url] = etag
+
+    log(f"  Loaded {sum(1 for status in STATUS if status)} metrics")
+
+    # The response bodies and decoded payloads are garbage now; reclaim
+    # them here, between frames, and push the automatic trigger out so
+    # the next collection comes from heap growth rather than a frame
+    gc.collect()
+    gc.threshold(gc.mem_free() // 4 + gc.mem_alloc())
+    if __debug__:
+        log(f"  Heap free: {gc.mem_free()}")
+    return ok
 
 
 # =============================================================================
 # RENDERING
 # =============================================================================
 
-@micropython.native
-def draw_bubbles():
-    """Draw all bubbles with glow effect"""
-    # Clear to black
+# Glow footprints per integer radius, built once so drawing a bubble is an
+# offset add and bounds check per pixel: (dx, dy, tier) packed as 3 bytes,
+# with dx/dy biased by GLOW_BIAS to stay unsigned. Tier 2 = bright, 1 = mid,
+# 0 = dim ring. Bubble radii are quantized to 2..4 at construction.
+GLOW_BIAS = 8
+MAX_RADIUS = 4
+
+
+def glow_footprint(r):
+    """Pack the (dx, dy, tier) entries for one radius"""
+    outer_sq = (r + 1) * (r + 1)
+    bright_sq = r * r * 0.3
+    mid_sq = r * r * 0.7
+    packed = []
+    for dy in range(-r - 1, r + 2):
+        for dx in range(-r - 1, r + 2):
+            dist_sq = dx * dx + dy * dy
+            if dist_sq <= outer_sq:
+                tier = 2 if dist_sq <= bright_sq else 1 if dist_sq <= mid_sq else 0
+                packed += (dx + GLOW_BIAS, dy + GLOW_BIAS, tier)
+    return bytes(packed)
+
+
+_footprints = [glow_footprint(r) for r in range(MAX_RADIUS + 1)]
+GLOW_OFFSETS = b"".join(_footprints)
+GLOW_STARTS = array('H', [0])  # radius r spans GLOW_STARTS[r]:GLOW_STARTS[r + 1]
+for _fp in _footprints:
+    GLOW_STARTS.append(GLOW_STARTS[-1] + len(_fp))
+del _footprints, _fp
+
+# Palette-index frame buffers: 0 = black, otherwise 1 + 3 * PEN_LUT row + tier.
+# PREV_FRAME mirrors what is on the display so only changed pixels are redrawn.
+PALETTE = (PEN_BLACK,) + tuple(pen for pens in PEN_LUT for pen in pens)
+PALETTE_SIZE = len(PALETTE)
+# Glow tier (0 dim, 1 mid, 2 bright) of each palette index, so fill_glow
+# compares tiers with a table read rather than arithmetic on the index
+TIER_OF = bytes([0] + [tier for pens in PEN_LUT for tier in range(len(pens))])
+FRAME = bytearray(WIDTH * HEIGHT)
+PREV_FRAME = bytearray(WIDTH * HEIGHT)
+DIRTY = array('H', [0] * (WIDTH * HEIGHT))
+PEN_COUNTS = array('H', [0] * PALETTE_SIZE)
+
+# Per bubble, the (cell, spec) last drawn: cell = x + 256 * y. Bubbles drift
+# a fraction of a pixel per frame, so most frames change no cell or colour
+# and can skip the fill/diff/update entirely.
+DRAWN = array('i', [-1] * (2 * len(METRIC_NAMES)))
+
+
+@micropython.viper
+def fill_glow(frame: ptr8, cx: int, cy: int, spec: int):
+    """Stamp one bubble's glow footprint into frame (spec = radius | pen_base << 8)"""
+    w = int(WIDTH)
+    h = int(HEIGHT)
+    radius = spec & 0xff
+    pen_base = spec >> 8
+    ox = cx - int(GLOW_BIAS)
+    oy = cy - int(GLOW_BIAS)
+    offsets = ptr8(GLOW_OFFSETS)
+    starts = ptr16(GLOW_STARTS)
+    tier_of = ptr8(TIER_OF)
+    k = int(starts[radius])
+    end = int(starts[radius + 1])
+    while k < end:
+        px = ox + int(offsets[k])
+        py = oy + int(offsets[k + 1])
+        if px >= 0 and px < w and py >= 0 and py < h:
+            # Where glows overlap the brighter tier wins, whichever bubble
+            # it belongs to; equal tiers go to the later bubble
+            i = py * w + px
+            tier = int(offsets[k + 2])
+            old = int(frame[i])
+            if old == 0 or tier >= int(tier_of[old]):
+                frame[i] = pen_base + tier
+        k += 3
+
+
+@micropython.viper
+def diff_frame(frame: ptr8, prev: ptr8, dirty: ptr16, counts: ptr16) -> int:
+    """Copy changed pixels into prev and reset frame; list the changed
+    indices in dirty grouped by palette index, so each pen is set once"""
+    size = int(WIDTH) * int(HEIGHT)
+    pens = int(PALETTE_SIZE)
+    for p in range(pens):
+        counts[p] = 0
+    for i in range(size):
+        index = frame[i]
+        if index != prev[i]:
+            counts[index] += 1
+
+    # Counting sort: turn per-pen counts into each group's start offset
+    n = 0
+    for p in range(pens):
+        c = counts[p]
+        counts[p] = n
+        n += c
+
+    for i in range(size):
+        index = frame[i]
+        if index != prev[i]:
+            prev[i] = index
+            dirty[counts[index]] = i
+            counts[index] += 1
+        frame[i] = 0
+    return n
+
+
+def reset_frame():
+    """Blank the display and forget the previous frame"""
     graphics.set_pen(PEN_BLACK)
     graphics.clear()
+    for i in range(WIDTH * HEIGHT):
+        PREV_FRAME[i] = 0
+    for i in range(len(DRAWN)):
+        DRAWN[i] = -1
 
-    # Draw each bubble
+
+@micropython.native
+def draw_bubbles():
+    """Draw all bubbles with glow effect"""
+    # Advance the animation; nothing to draw unless a bubble moved to a new
+    # cell or changed colour
+    drawn = DRAWN
+    changed = False
+    k = 0
     for bubble in bubbles:
         bubble.update()
-        pen_dim, pen_mid, pen_bright = bubble.get_pens()
-
-        cx, cy = int(bubble.x), int(bubble.y)
-        radius = int(bubble.r)
-
-        # Draw concentric rings for glow effect (fast version)
-        # Outer ring (dim)
-        for dy in range(-radius-1, radius+2):
-            for dx in range(-radius-1, radius+2):
-                px, py = cx + dx, cy + dy
-                if 0 <= px < WIDTH and 0 <= py < HEIGHT:
-                    dist_sq = dx*dx + dy*dy
-                    r_sq = (radius+1) * (radius+1)
-                    if dist_sq <= r_sq:
-                        if dist_sq <= radius * radius * 0.3:
-                            graphics.set_pen(pen_bright)
-                        elif dist_sq <= radius * radius * 0.7:
-                            graphics.set_pen(pen_mid)
-                        else:
-                            graphics.set_pen(pen_dim)
-                        graphics.pixel(px, py)
+        cell = int(bubble.x) + 256 * int(bubble.y)
+        spec = bubble.radius | ((1 + 3 * bubble.get_pen_row()) << 8)
+        if drawn[k] != cell or drawn[k + 1] != spec:
+            drawn[k] = cell
+            drawn[k + 1] = spec
+            changed = True
+        k += 2
+    if not changed:
+        return
+
+    # Classify every bubble's glow into the frame buffer
+    frame = FRAME
+    k = 0
+    for bubble in bubbles:
+        fill_glow(frame, int(bubble.x), int(bubble.y), drawn[k + 1])
+        k += 2
+
+    # Only touch pixels that differ from what is already on the display,
+    # switching pen once per palette group rather than once per pixel
+    prev = PREV_FRAME
+    dirty = DIRTY
+    pen = -1
+    for k in range(diff_frame(frame, prev, dirty, PEN_COUNTS)):
+        i = dirty[k]
+        if prev[i] != pen:
+            pen = prev[i]
+            graphics.set_pen(PALETTE[pen])
+        graphics.pixel(i % WIDTH, i // WIDTH)
 
     gu.update(graphics)
 
 
 def show_connecting():
     """Show yellow bubbles while connecting"""
-    graphics.set_pen(graphics.create_pen(0, 0, 0))
+    graphics.set_pen(PEN_BLACK)
     graphics.clear()
 
+    graphics.set_pen(PEN_YELLOW_BRIGHT)
     for i in range(5):
         x = 10 + i * 8
-        graphics.set_pen(graphics.create_pen(255, 200, 0))
         graphics.pixel(x, 5)
 
     gu.update(graphics)
@@ -297,9 +890,9 @@ def show_connecting():
 
 def show_error():
     """Show red X on error"""
-    graphics.set_pen(graphics.create_pen(0, 0, 0))
+    graphics.set_pen(PEN_BLACK)
     graphics.clear()
-    graphics.set_pen(graphics.create_pen(255, 0, 0))
+    graphics.set_pen(PEN_RED_BRIGHT)
 
     for i in range(min(WIDTH, HEIGHT)):
         graphics.pixel(i, i)
@@ -312,7 +905,113 @@ def show_error():
 # MAIN
 # =============================================================================
 
-def main():
+# Set by the SWITCH_A button to make fetch_task poll immediately
+refresh_requested = uasyncio.Event()
+
+
+def is_healthy(statuses):
+    """True when no metric is degraded or in outage"""
+    for status in statuses:
+        if status == STATUS_DEGRADED or status == STATUS_OUTAGE:
+            return False
+    return True
+
+
+def worsened(current, previous):
+    """True if any metric moved into degraded/outage since the last poll"""
+    for now, before in zip(current, previous):
+        if now != before and (now == STATUS_DEGRADED or now == STATUS_OUTAGE):
+            return True
+    return False
+
+
+async def fetch_task():
+    """Poll Lens in the background so the animation never waits on the network"""
+    global stale_ms
+    interval = REFRESH_INTERVAL_MS
+    previous = bytes(STATUS)
+    stable = 0
+
+    while True:
+        try:
+            await uasyncio.wait_for_ms(refresh_requested.wait(), interval)
+            force = True
+        except uasyncio.TimeoutError:
+            force = False
+        refresh_requested.clear()
+        if not await fetch_metrics(force):
+            # A failed poll says nothing about stability
+            stable = 0
+            continue
+
+        # Adapt the poll interval to how settled the system looks
+        current = bytes(STATUS)
+        last_interval = interval
+        if current == previous:
+            stable += 1
+            if stable >= STABLE_POLLS:
+                stable = 0
+                # Keep tracking at the base rate while anything is unhealthy
+                ceiling = MAX_REFRESH_MS if is_healthy(current) else REFRESH_INTERVAL_MS
+                interval = min(interval * 2, ceiling)
+        else:
+            stable = 0
+            interval = MIN_REFRESH_MS if worsened(current, previous) else REFRESH_INTERVAL_MS
+        if interval != last_interval:
+            log(f"  Poll interval now {interval} ms")
+        previous = current
+        stale_ms = 2 * interval
+
+
+async def render_task():
+    """Handle buttons and animate at ~20 FPS"""
+    held = False      # a brightness button was down last frame
+    repeat_at = 0     # ticks_ms of the next brightness step while held
+    prev_a = False
+    next_frame = time.ticks_ms()
+    while True:
+        # Button controls: brightness steps on press, then every
+        # BUTTON_REPEAT_MS while held; refresh fires once per press
+        up = gu.is_pressed(GalacticUnicorn.SWITCH_BRIGHTNESS_UP)
+        down = gu.is_pressed(GalacticUnicorn.SWITCH_BRIGHTNESS_DOWN)
+        a = gu.is_pressed(GalacticUnicorn.SWITCH_A)
+        if up != down:
+            now = time.ticks_ms()
+            if not held or time.ticks_diff(now, repeat_at) >= 0:
+                gu.adjust_brightness(+0.05 if up else -0.05)
+                # Brightness is applied when the buffer is pushed, and
+                # draw_bubbles skips the push on frames where nothing moved
+                gu.update(graphics)
+                repeat_at = time.ticks_add(now, BUTTON_REPEAT_MS)
+            held = True
+        else:
+            held = False
+        if a and not prev_a:
+            refresh_requested.set()
+        prev_a = a
+
+        # Animate with the collector off so a GC pause can't land mid-frame;
+        # frames allocate little, so collecting at this safe point is enough
+        if gc.mem_free() < GC_HEADROOM:
+            gc.collect()
+        gc.disable()
+        try:
+            draw_bubbles()
+        finally:
+            gc.enable()
+
+        # Sleep only what is left of this frame's slot, so drawing time
+        # doesn't stretch the cadence; after a long stall (e.g. a TLS
+        # handshake hogging the loop) restart the schedule, don't catch up
+        next_frame = time.ticks_add(next_frame, FRAME_MS)
+        wait = time.ticks_diff(next_frame, time.ticks_ms())
+        if wait < 0:
+            next_frame = time.ticks_ms()
+            wait = 0
+        await uasyncio.sleep_ms(wait)
+
+
+async def main():
     log("=" * 40)
     log("CIRIS Status Bubbles")
     log(f"Display: {WIDTH}x{HEIGHT}")
@@ -327,33 +1026,17 @@ def main():
 
     setup_bubbles()
 
-    if not fetch_metrics():
+    if not await fetch_metrics():
         log("Initial fetch failed, continuing anyway...")
 
-    last_fetch = time.ticks_ms()
-
     log("Starting bubble animation...")
+    reset_frame()
 
-    while True:
-        # Button controls
-        if gu.is_pressed(GalacticUnicorn.SWITCH_BRIGHTNESS_UP):
-            gu.adjust_brightness(+0.05)
-        if gu.is_pressed(GalacticUnicorn.SWITCH_BRIGHTNESS_DOWN):
-            gu.adjust_brightness(-0.05)
-        if gu.is_pressed(GalacticUnicorn.SWITCH_A):
-            fetch_metrics()
-            last_fetch = time.ticks_ms()
-
-        # Periodic refresh
-        if time.ticks_diff(time.ticks_ms(), last_fetch) > REFRESH_INTERVAL_MS:
-            fetch_metrics()
-            last_fetch = time.ticks_ms()
-
-        # Animate
-        draw_bubbles()
-
-        time.sleep_ms(50)  # ~20 FPS
+    # Network and display run as independent tasks; both touch shared state
+    # only from the single-threaded event loop, so no locking is needed
+    uasyncio.create_task(fetch_task())
+    await render_task()
 
 
 if __name__ == "__main__":
-    main()
+    uasyncio.run(main())
@@ -2,43 +2,289 @@
 Pytest fixtures for CIRISBridge tests.
 """
 
+import hashlib
 import os
+import re
+import subprocess
 import tempfile
 import shutil
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Mapping
 from unittest.mock import MagicMock, patch
 
 import pytest
 
 
-# Project root directory
-PROJECT_ROOT = Path(__file__).parent.parent
+# Project root directory, resolved once at import
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def project_root():
     """Return the project root directory."""
     return PROJECT_ROOT
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def terraform_dir(project_root):
     """Return the terraform directory."""
     return project_root / "terraform"
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def ansible_dir(project_root):
     """Return the ansible directory."""
     return project_root / "ansible"
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def scripts_dir(project_root):
     """Return the scripts directory."""
     return project_root / "scripts"
 
 
+# Top-level documentation files checked by test_documentation.py
+DOC_FILES = ["README.md", "CLAUDE.md", "FSD.md", "LICENSE", ".env.example"]
+
+
+@pytest.fixture(scope="session")
+def doc_exists(project_root):
+    """Return which documentation files exist, checked once per session."""
+    return {name: (project_root / name).exists() for name in DOC_FILES}
+
+
+@pytest.fixture(scope="session")
+def doc_contents(project_root, doc_exists):
+    """Return the bytes of each existing documentation file, read once per session."""
+    return {
+        name: (project_root / name).read_bytes()
+        for name, exists in doc_exists.items()
+        if exists
+    }
+
+
+# Terraform files inspected by the terraform tests, relative to terraform/
+TERRAFORM_FILES = ["main.tf", "variables.tf", "outputs.tf", "terraform.tfvars.example"]
+
+
+@pytest.fixture(scope="session")
+def tf_contents(terraform_dir):
+    """Return the bytes of each existing file in TERRAFORM_FILES, read once per session."""
+    return {
+        name: (terraform_dir / name).read_bytes()
+        for name in TERRAFORM_FILES
+        if (terraform_dir / name).exists()
+    }
+
+
+# Top-level declarations start at column 0, so commented-out blocks never match
+TF_VARIABLE = re.compile(rb'^variable\s+"([^"]+)"', re.MULTILINE)
+TF_OUTPUT = re.compile(rb'^output\s+"([^"]+)"', re.MULTILINE)
+TF_RESOURCE = re.compile(rb'^resource\s+"([^"]+)"\s+"([^"]+)"', re.MULTILINE)
+# A firewall rule's port argument, quoted or bare; skips "# port = ..." comments
+TF_PORT = re.compile(rb'^[ \t]*port\s*=\s*"?(\d+)', re.MULTILINE)
+
+
+@dataclass(frozen=True)
+class TerraformConfig:
+    """Names declared across the .tf files; resources map type to names."""
+
+    variables: frozenset
+    outputs: frozenset
+    resources: Mapping[str, frozenset]
+    ports: frozenset
+
+
+@pytest.fixture(scope="session")
+def tf_config(tf_contents):
+    """Return the TerraformConfig parsed from the cached .tf files, once per session."""
+    variables, outputs, ports = set(), set(), set()
+    resources = {}
+    for name, content in tf_contents.items():
+        if not name.endswith(".tf"):
+            continue
+        variables.update(var.decode() for var in TF_VARIABLE.findall(content))
+        outputs.update(out.decode() for out in TF_OUTPUT.findall(content))
+        ports.update(port.decode() for port in TF_PORT.findall(content))
+        for rtype, rname in TF_RESOURCE.findall(content):
+            resources.setdefault(rtype.decode(), set()).add(rname.decode())
+    return TerraformConfig(
+        variables=frozenset(variables),
+        outputs=frozenset(outputs),
+        resources={rtype: frozenset(names) for rtype, names in resources.items()},
+        ports=frozenset(ports),
+    )
+
+
+# Ansible files inspected by the integration tests, relative to ansible/
+ANSIBLE_TEMPLATES = [
+    "playbooks/site.yml",
+    "roles/caddy/templates/Caddyfile.j2",
+    "roles/constellation/templates/zones.yaml.j2",
+    "roles/billing/templates/docker-compose.yml.j2",
+]
+
+
+@pytest.fixture(scope="session")
+def ansible_templates(ansible_dir):
+    """Return the bytes of each existing file in ANSIBLE_TEMPLATES, read once per session."""
+    return {
+        name: (ansible_dir / name).read_bytes()
+        for name in ANSIBLE_TEMPLATES
+        if (ansible_dir / name).exists()
+    }
+
+
+@pytest.fixture(scope="session")
+def scripts_content(scripts_dir):
+    """Return {name: (bytes, is_executable)} for every scripts/*.sh, read once per session."""
+    return {
+        path.name: (path.read_bytes(), os.access(path, os.X_OK))
+        for path in scripts_dir.glob("*.sh")
+    }
+
+
+# Suffixes of the Terraform/Ansible files scanned for hardcoded secrets
+CONFIG_SUFFIXES = {".tf", ".yml", ".j2"}
+
+
+@pytest.fixture(scope="session")
+def config_files(project_root):
+    """Return every Terraform/YAML/Jinja file in the project, found in one walk."""
+    files = []
+    for root, dirs, names in os.walk(project_root):
+        # Provider caches and git objects hold no project config
+        dirs[:] = [name for name in dirs if name not in (".terraform", ".git")]
+        files.extend(
+            Path(root, name) for name in names
+            if os.path.splitext(name)[1] in CONFIG_SUFFIXES
+        )
+    return files
+
+
+@pytest.fixture(scope="session")
+def shellcheck_available():
+    """Return whether shellcheck can be run, probed once per session."""
+    try:
+        result = subprocess.run(
+            ["shellcheck", "--version"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+    except FileNotFoundError:
+        return False
+    return result.returncode == 0
+
+
+@pytest.fixture(scope="session")
+def terraform_cli():
+    """Return the terraform executable if it can be run, else None; probed once per session."""
+    path = shutil.which("terraform")
+    if path is None:
+        return None
+    result = subprocess.run(
+        [path, "version"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    return path if result.returncode == 0 else None
+
+
+# Suffixes of the files `terraform fmt -recursive` checks
+TF_FMT_SUFFIXES = {".tf", ".tfvars"}
+
+# pytest cache key holding the fingerprint of the last tree that passed fmt
+TF_FMT_CACHE_KEY = "cirisbridge/terraform_fmt_ok"
+
+
+@pytest.fixture(scope="session")
+def tf_files(terraform_dir):
+    """Return every file under terraform/ that terraform fmt checks, found in one walk."""
+    files = []
+    for root, dirs, names in os.walk(terraform_dir):
+        # Provider caches are not formatted
+        dirs[:] = [name for name in dirs if name != ".terraform"]
+        files.extend(
+            Path(root, name) for name in names
+            if os.path.splitext(name)[1] in TF_FMT_SUFFIXES
+        )
+    return sorted(files)
+
+
+@pytest.fixture(scope="session")
+def terraform_checks(terraform_dir, terraform_cli, tf_files, tmp_path_factory, pytestconfig):
+    """Run every terraform CLI check once per session and return the results.
+
+    Returns {"fmt", "init", "validate"} CompletedProcess results with bytes
+    output, decoded only by a failing test; "validate" is None when init
+    failed. init and validate run in a copy of the terraform directory so
+    .terraform/ and the lock file stay out of the source tree. fmt is
+    skipped when neither the terraform binary nor any .tf file's path,
+    mtime or size has changed since it last passed.
+    """
+    if terraform_cli is None:
+        pytest.skip("Terraform not installed")
+
+    # The binary is keyed by its resolved file too, so an in-place upgrade
+    # behind the same path (brew, tfenv symlinks) reruns fmt
+    binary = os.path.realpath(terraform_cli)
+    binary_stat = os.stat(binary)
+    digest = hashlib.blake2b(
+        f"{binary}\0{binary_stat.st_mtime_ns}\0{binary_stat.st_size}\n".encode()
+    )
+    for path in tf_files:
+        stat = path.stat()
+        digest.update(f"{path}\0{stat.st_mtime_ns}\0{stat.st_size}\n".encode())
+    fingerprint = digest.hexdigest()
+
+    fmt_args = [terraform_cli, "fmt", "-check", "-diff", "-recursive"]
+    # Absent under -p no:cacheprovider
+    cache = getattr(pytestconfig, "cache", None)
+    fmt_cached = cache is not None and cache.get(TF_FMT_CACHE_KEY, None) == fingerprint
+
+    checks = {}
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        # fmt only reads the source tree, so it overlaps the copy, init and validate
+        fmt_future = None if fmt_cached else pool.submit(
+            subprocess.run,
+            fmt_args,
+            cwd=terraform_dir,
+            capture_output=True,
+        )
+
+        workdir = tmp_path_factory.mktemp("tf")
+        shutil.copytree(
+            terraform_dir,
+            workdir,
+            ignore=shutil.ignore_patterns(".terraform"),
+            dirs_exist_ok=True,
+        )
+
+        checks["init"] = subprocess.run(
+            [terraform_cli, "init", "-backend=false"],
+            cwd=workdir,
+            capture_output=True,
+        )
+        checks["validate"] = None
+        if checks["init"].returncode == 0:
+            checks["validate"] = subprocess.run(
+                [terraform_cli, "validate"],
+                cwd=workdir,
+                capture_output=True,
+            )
+
+    if fmt_future is None:
+        checks["fmt"] = subprocess.CompletedProcess(fmt_args, 0, stdout=b"", stderr=b"")
+    else:
+        checks["fmt"] = fmt_future.result()
+        if cache is not None and checks["fmt"].returncode == 0:
+            cache.set(TF_FMT_CACHE_KEY, fingerprint)
+
+    return checks
+
+
 @pytest.fixture
 def sample_terraform_vars():
     """Sample Terraform variables for testing."""
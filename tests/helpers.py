@@ -0,0 +1,8 @@
+"""
+Shared helpers for CIRISBridge tests.
+"""
+
+
+def missing_tokens(content, tokens):
+    """Return the str tokens that do not occur in the bytes content, in their given order."""
+    return [token for token in tokens if token.encode() not in content]
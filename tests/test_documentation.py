@@ -6,133 +6,113 @@ from pathlib import Path
 
 import pytest
 
+from helpers import missing_tokens
+
 
 class TestReadmeDocumentation:
     """Tests for README.md completeness."""
 
-    def test_readme_exists(self, project_root):
+    def test_readme_exists(self, doc_exists):
         """Test that README.md exists."""
-        readme = project_root / "README.md"
-        assert readme.exists(), "README.md should exist"
-
-    def test_readme_has_sections(self, project_root):
+        assert doc_exists["README.md"], "README.md should exist"
+
+    @pytest.mark.parametrize("section", [
+        "Overview",
+        "Quick Start",
+        "Architecture",
+        "Cost",
+    ])
+    def test_readme_has_sections(self, doc_contents, section):
         """Test that README has required sections."""
-        readme = project_root / "README.md"
-        content = readme.read_text()
-
-        required_sections = [
-            "Overview",
-            "Quick Start",
-            "Architecture",
-            "Cost",
-        ]
-
-        for section in required_sections:
-            assert section in content, f"README should have {section} section"
-
-    def test_readme_has_commands(self, project_root):
+        assert section.encode() in doc_contents["README.md"], \
+            f"README should have section: {section}"
+
+    @pytest.mark.parametrize("command", [
+        "deploy.sh",
+        "health-check.sh",
+        "terraform",
+        "ansible",
+    ])
+    def test_readme_has_commands(self, doc_contents, command):
         """Test that README documents key commands."""
-        readme = project_root / "README.md"
-        content = readme.read_text()
-
-        commands = [
-            "deploy.sh",
-            "health-check.sh",
-            "terraform",
-            "ansible",
-        ]
-
-        for cmd in commands:
-            assert cmd in content, f"README should document {cmd}"
+        assert command.encode() in doc_contents["README.md"], \
+            f"README should document: {command}"
 
 
 class TestClaudeMdDocumentation:
     """Tests for CLAUDE.md guidance file."""
 
-    def test_claude_md_exists(self, project_root):
+    def test_claude_md_exists(self, doc_exists):
         """Test that CLAUDE.md exists."""
-        claude_md = project_root / "CLAUDE.md"
-        assert claude_md.exists(), "CLAUDE.md should exist"
+        assert doc_exists["CLAUDE.md"], "CLAUDE.md should exist"
 
-    def test_claude_md_has_context(self, project_root):
+    def test_claude_md_has_context(self, doc_contents):
         """Test that CLAUDE.md provides project context."""
-        claude_md = project_root / "CLAUDE.md"
-        content = claude_md.read_text()
+        content = doc_contents["CLAUDE.md"]
 
         # Should explain what the project is
-        assert "CIRISBridge" in content
-        assert "orchestration" in content.lower() or "infrastructure" in content.lower()
+        assert b"CIRISBridge" in content
+        assert b"orchestration" in content.lower() or b"infrastructure" in content.lower()
 
-    def test_claude_md_has_commands(self, project_root):
+    def test_claude_md_has_commands(self, doc_contents):
         """Test that CLAUDE.md documents build commands."""
-        claude_md = project_root / "CLAUDE.md"
-        content = claude_md.read_text()
+        content = doc_contents["CLAUDE.md"]
 
         # Should have code blocks with commands
-        assert "```" in content, "CLAUDE.md should have code blocks"
-        assert "deploy" in content.lower()
-
-    def test_claude_md_has_key_files(self, project_root):
+        assert b"```" in content, "CLAUDE.md should have code blocks"
+        assert b"deploy" in content.lower()
+
+    @pytest.mark.parametrize("key_file", [
+        "main.tf",
+        "site.yml",
+        "deploy.sh",
+    ])
+    def test_claude_md_has_key_files(self, doc_contents, key_file):
         """Test that CLAUDE.md lists key files."""
-        claude_md = project_root / "CLAUDE.md"
-        content = claude_md.read_text()
-
-        key_files = [
-            "main.tf",
-            "site.yml",
-            "deploy.sh",
-        ]
-
-        for filename in key_files:
-            assert filename in content, f"CLAUDE.md should mention {filename}"
+        assert key_file.encode() in doc_contents["CLAUDE.md"], \
+            f"CLAUDE.md should mention: {key_file}"
 
 
 class TestFsdDocumentation:
     """Tests for FSD.md specification."""
 
-    def test_fsd_exists(self, project_root):
+    def test_fsd_exists(self, doc_exists):
         """Test that FSD.md exists."""
-        fsd = project_root / "FSD.md"
-        assert fsd.exists(), "FSD.md should exist"
+        assert doc_exists["FSD.md"], "FSD.md should exist"
 
-    def test_fsd_is_locked(self, project_root):
+    def test_fsd_is_locked(self, doc_contents):
         """Test that FSD.md mentions it's locked."""
-        fsd = project_root / "FSD.md"
-        content = fsd.read_text()
+        content = doc_contents["FSD.md"]
 
         # FSD should indicate it's a locked specification
-        assert "lock" in content.lower() or "specification" in content.lower()
+        assert b"lock" in content.lower() or b"specification" in content.lower()
 
 
 class TestLicenseDocumentation:
     """Tests for LICENSE file."""
 
-    def test_license_exists(self, project_root):
+    def test_license_exists(self, doc_exists):
         """Test that LICENSE file exists."""
-        license_file = project_root / "LICENSE"
-        assert license_file.exists(), "LICENSE should exist"
+        assert doc_exists["LICENSE"], "LICENSE should exist"
 
-    def test_license_is_apache2(self, project_root):
+    def test_license_is_apache2(self, doc_contents):
         """Test that license is Apache 2.0."""
-        license_file = project_root / "LICENSE"
-        content = license_file.read_text()
+        content = doc_contents["LICENSE"]
 
-        assert "Apache" in content, "License should be Apache 2.0"
-        assert "2.0" in content, "License should be version 2.0"
+        assert b"Apache" in content, "License should be Apache 2.0"
+        assert b"2.0" in content, "License should be version 2.0"
 
 
 class TestExampleFiles:
     """Tests for example configuration files."""
 
-    def test_env_example_exists(self, project_root):
+    def test_env_example_exists(self, doc_exists):
         """Test that .env.example exists."""
-        env_example = project_root / ".env.example"
-        assert env_example.exists(), ".env.example should exist"
+        assert doc_exists[".env.example"], ".env.example should exist"
 
-    def test_env_example_has_required_vars(self, project_root):
+    def test_env_example_has_required_vars(self, doc_contents):
         """Test that .env.example documents required variables."""
-        env_example = project_root / ".env.example"
-        content = env_example.read_text()
+        content = doc_contents[".env.example"]
 
         required_vars = [
             "VULTR_API_KEY",
@@ -141,8 +121,8 @@ class TestExampleFiles:
             "POSTGRES_PASSWORD",
         ]
 
-        for var in required_vars:
-            assert var in content, f".env.example should document {var}"
+        missing = missing_tokens(content, required_vars)
+        assert not missing, f".env.example should document: {', '.join(missing)}"
 
     def test_tfvars_example_exists(self, project_root):
         """Test that terraform.tfvars.example exists."""
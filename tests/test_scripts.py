@@ -2,17 +2,18 @@
 Tests for shell scripts.
 """
 
-import os
 import subprocess
 from pathlib import Path
 
 import pytest
 
+from helpers import missing_tokens
+
 
 class TestScriptStructure:
     """Tests for script file structure."""
 
-    def test_required_scripts_exist(self, scripts_dir):
+    def test_required_scripts_exist(self, scripts_content):
         """Test that required scripts exist."""
         required_scripts = [
             "deploy.sh",
@@ -22,192 +23,164 @@ class TestScriptStructure:
             "failover-db.sh",
         ]
 
-        for script in required_scripts:
-            script_path = scripts_dir / script
-            assert script_path.exists(), f"Missing required script: {script}"
+        missing = [script for script in required_scripts
+                   if script not in scripts_content]
+        assert not missing, f"Missing required scripts: {', '.join(missing)}"
 
-    def test_scripts_are_executable(self, scripts_dir):
+    def test_scripts_are_executable(self, scripts_content):
         """Test that scripts are executable."""
-        for script_file in scripts_dir.glob("*.sh"):
-            assert os.access(script_file, os.X_OK), \
-                f"Script {script_file.name} should be executable"
+        for name, (_, executable) in scripts_content.items():
+            assert executable, f"Script {name} should be executable"
 
-    def test_scripts_have_shebang(self, scripts_dir):
+    def test_scripts_have_shebang(self, scripts_content):
         """Test that scripts have proper shebang."""
-        for script_file in scripts_dir.glob("*.sh"):
-            content = script_file.read_text()
-            assert content.startswith("#!/bin/bash"), \
-                f"Script {script_file.name} should have bash shebang"
+        for name, (content, _) in scripts_content.items():
+            assert content.startswith(b"#!/bin/bash"), \
+                f"Script {name} should have bash shebang"
 
-    def test_scripts_use_strict_mode(self, scripts_dir):
+    def test_scripts_use_strict_mode(self, scripts_content):
         """Test that scripts use strict mode (set -euo pipefail)."""
-        for script_file in scripts_dir.glob("*.sh"):
-            content = script_file.read_text()
-            assert "set -euo pipefail" in content, \
-                f"Script {script_file.name} should use strict mode"
+        for name, (content, _) in scripts_content.items():
+            assert b"set -euo pipefail" in content, \
+                f"Script {name} should use strict mode"
 
 
 class TestShellcheck:
     """Tests using shellcheck for script analysis."""
 
-    def test_shellcheck_available(self):
+    def test_shellcheck_available(self, shellcheck_available):
         """Check if shellcheck is available."""
-        try:
-            result = subprocess.run(
-                ["shellcheck", "--version"],
-                capture_output=True,
-                text=True,
-            )
-            if result.returncode != 0:
-                pytest.skip("shellcheck not installed")
-        except FileNotFoundError:
+        if not shellcheck_available:
             pytest.skip("shellcheck not installed")
 
-    def test_scripts_pass_shellcheck(self, scripts_dir):
+    def test_scripts_pass_shellcheck(self, scripts_dir, shellcheck_available):
         """Test that scripts pass shellcheck."""
-        # Check if shellcheck is available
-        try:
-            subprocess.run(["shellcheck", "--version"], capture_output=True)
-        except FileNotFoundError:
+        if not shellcheck_available:
             pytest.skip("shellcheck not installed")
 
-        for script_file in scripts_dir.glob("*.sh"):
-            result = subprocess.run(
-                ["shellcheck", "-S", "warning", str(script_file)],
-                capture_output=True,
-                text=True,
-            )
+        # One shellcheck run over every script; its output names each file
+        scripts = sorted(str(path) for path in scripts_dir.glob("*.sh"))
+        result = subprocess.run(
+            ["shellcheck", "-S", "warning", "--", *scripts],
+            capture_output=True,
+        )
 
-            # Allow some warnings but fail on errors
-            if result.returncode != 0 and "error" in result.stdout.lower():
-                pytest.fail(f"Shellcheck errors in {script_file.name}:\n{result.stdout}")
+        # Allow some warnings but fail on errors
+        if result.returncode != 0 and b"error" in result.stdout.lower():
+            pytest.fail(f"Shellcheck errors:\n{result.stdout.decode(errors='replace')}")
 
 
 class TestDeployScript:
     """Tests for deploy.sh script."""
 
-    def test_deploy_script_has_commands(self, scripts_dir):
+    def test_deploy_script_has_commands(self, scripts_content):
         """Test that deploy.sh handles all deployment commands."""
-        deploy_script = scripts_dir / "deploy.sh"
-        content = deploy_script.read_text()
+        content = scripts_content["deploy.sh"][0]
 
         commands = ["all", "infra", "services", "dns", "billing", "proxy"]
 
-        for cmd in commands:
-            assert cmd in content, f"deploy.sh should handle command: {cmd}"
+        missing = missing_tokens(content, commands)
+        assert not missing, f"deploy.sh should handle commands: {', '.join(missing)}"
 
-    def test_deploy_script_checks_prereqs(self, scripts_dir):
+    def test_deploy_script_checks_prereqs(self, scripts_content):
         """Test that deploy.sh checks prerequisites."""
-        deploy_script = scripts_dir / "deploy.sh"
-        content = deploy_script.read_text()
+        content = scripts_content["deploy.sh"][0]
 
-        assert "terraform" in content, "deploy.sh should check for terraform"
-        assert "ansible" in content, "deploy.sh should check for ansible"
+        assert b"terraform" in content, "deploy.sh should check for terraform"
+        assert b"ansible" in content, "deploy.sh should check for ansible"
 
-    def test_deploy_script_prompts_for_confirmation(self, scripts_dir):
+    def test_deploy_script_prompts_for_confirmation(self, scripts_content):
         """Test that deploy.sh prompts before terraform apply."""
-        deploy_script = scripts_dir / "deploy.sh"
-        content = deploy_script.read_text()
+        content = scripts_content["deploy.sh"][0]
 
-        assert "read -p" in content, "deploy.sh should prompt for confirmation"
+        assert b"read -p" in content, "deploy.sh should prompt for confirmation"
 
 
 class TestHealthCheckScript:
     """Tests for health-check.sh script."""
 
-    def test_health_check_checks_services(self, scripts_dir):
+    def test_health_check_checks_services(self, scripts_content):
         """Test that health-check.sh checks all services."""
-        health_script = scripts_dir / "health-check.sh"
-        content = health_script.read_text()
+        content = scripts_content["health-check.sh"][0]
 
-        services = ["Billing", "Proxy", "DNS"]
+        services = [b"Billing", b"Proxy", b"DNS"]
 
         for service in services:
-            assert service in content, f"health-check.sh should check {service}"
+            assert service in content, f"health-check.sh should check {service.decode()}"
 
-    def test_health_check_uses_curl(self, scripts_dir):
+    def test_health_check_uses_curl(self, scripts_content):
         """Test that health-check.sh uses curl for HTTP checks."""
-        health_script = scripts_dir / "health-check.sh"
-        content = health_script.read_text()
+        content = scripts_content["health-check.sh"][0]
 
-        assert "curl" in content, "health-check.sh should use curl"
+        assert b"curl" in content, "health-check.sh should use curl"
 
-    def test_health_check_uses_dig(self, scripts_dir):
+    def test_health_check_uses_dig(self, scripts_content):
         """Test that health-check.sh uses dig for DNS checks."""
-        health_script = scripts_dir / "health-check.sh"
-        content = health_script.read_text()
+        content = scripts_content["health-check.sh"][0]
 
-        assert "dig" in content, "health-check.sh should use dig for DNS checks"
+        assert b"dig" in content, "health-check.sh should use dig for DNS checks"
 
 
 class TestBackupScript:
     """Tests for backup-db.sh script."""
 
-    def test_backup_uses_pg_dump(self, scripts_dir):
+    def test_backup_uses_pg_dump(self, scripts_content):
         """Test that backup-db.sh uses pg_dump."""
-        backup_script = scripts_dir / "backup-db.sh"
-        content = backup_script.read_text()
+        content = scripts_content["backup-db.sh"][0]
 
-        assert "pg_dump" in content, "backup-db.sh should use pg_dump"
+        assert b"pg_dump" in content, "backup-db.sh should use pg_dump"
 
-    def test_backup_compresses_output(self, scripts_dir):
+    def test_backup_compresses_output(self, scripts_content):
         """Test that backup-db.sh compresses backups."""
-        backup_script = scripts_dir / "backup-db.sh"
-        content = backup_script.read_text()
+        content = scripts_content["backup-db.sh"][0]
 
-        assert "gzip" in content, "backup-db.sh should compress with gzip"
+        assert b"gzip" in content, "backup-db.sh should compress with gzip"
 
-    def test_backup_cleans_old_files(self, scripts_dir):
+    def test_backup_cleans_old_files(self, scripts_content):
         """Test that backup-db.sh cleans old backups."""
-        backup_script = scripts_dir / "backup-db.sh"
-        content = backup_script.read_text()
+        content = scripts_content["backup-db.sh"][0]
 
-        assert "find" in content and "-delete" in content, \
+        assert b"find" in content and b"-delete" in content, \
             "backup-db.sh should clean old backups"
 
 
 class TestFailoverScript:
     """Tests for failover-db.sh script."""
 
-    def test_failover_checks_status(self, scripts_dir):
+    def test_failover_checks_status(self, scripts_content):
         """Test that failover-db.sh can check database status."""
-        failover_script = scripts_dir / "failover-db.sh"
-        content = failover_script.read_text()
+        content = scripts_content["failover-db.sh"][0]
 
-        assert "status" in content, "failover-db.sh should support status command"
-        assert "pg_isready" in content, "failover-db.sh should check pg_isready"
+        assert b"status" in content, "failover-db.sh should support status command"
+        assert b"pg_isready" in content, "failover-db.sh should check pg_isready"
 
-    def test_failover_prompts_confirmation(self, scripts_dir):
+    def test_failover_prompts_confirmation(self, scripts_content):
         """Test that failover-db.sh prompts before promoting."""
-        failover_script = scripts_dir / "failover-db.sh"
-        content = failover_script.read_text()
+        content = scripts_content["failover-db.sh"][0]
 
-        assert "Are you sure" in content or "read -p" in content, \
+        assert b"Are you sure" in content or b"read -p" in content, \
             "failover-db.sh should prompt before promotion"
 
-    def test_failover_uses_pg_ctl_promote(self, scripts_dir):
+    def test_failover_uses_pg_ctl_promote(self, scripts_content):
         """Test that failover-db.sh uses pg_ctl promote."""
-        failover_script = scripts_dir / "failover-db.sh"
-        content = failover_script.read_text()
+        content = scripts_content["failover-db.sh"][0]
 
-        assert "pg_ctl promote" in content, "failover-db.sh should use pg_ctl promote"
+        assert b"pg_ctl promote" in content, "failover-db.sh should use pg_ctl promote"
 
 
 class TestSyncRecordsScript:
     """Tests for sync-records.sh script."""
 
-    def test_sync_records_syncs_to_both_regions(self, scripts_dir):
+    def test_sync_records_syncs_to_both_regions(self, scripts_content):
         """Test that sync-records.sh syncs to both regions."""
-        sync_script = scripts_dir / "sync-records.sh"
-        content = sync_script.read_text()
+        content = scripts_content["sync-records.sh"][0]
 
-        assert "VULTR_IP" in content, "sync-records.sh should reference Vultr IP"
-        assert "HETZNER_IP" in content, "sync-records.sh should reference Hetzner IP"
+        assert b"VULTR_IP" in content, "sync-records.sh should reference Vultr IP"
+        assert b"HETZNER_IP" in content, "sync-records.sh should reference Hetzner IP"
 
-    def test_sync_records_uses_rest_api(self, scripts_dir):
+    def test_sync_records_uses_rest_api(self, scripts_content):
         """Test that sync-records.sh uses Constellation REST API."""
-        sync_script = scripts_dir / "sync-records.sh"
-        content = sync_script.read_text()
+        content = scripts_content["sync-records.sh"][0]
 
-        assert "curl" in content, "sync-records.sh should use curl"
-        assert "8080" in content, "sync-records.sh should target API port 8080"
+        assert b"curl" in content, "sync-records.sh should use curl"
+        assert b"8080" in content, "sync-records.sh should target API port 8080"